@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from enum import Enum
 from typing import Iterable, List, Optional
-from random import shuffle
+from random import Random, shuffle
 
 from colored import stylize, fg
 
@@ -209,12 +209,19 @@ class Hand(CardCollection):
 class Deck(CardCollection):
     """A class representing a playing deck of cards"""
 
+    def __init__(self, random: Optional[Random]=None) -> None:
+        super().__init__()
+        self._random = random
+
     def refill(self, decks_quantity: int=config.DECKS_QUANTITY) -> None:
         """Filling the collections with new cards using the quantity of decks of cards indicated in decks_quantity"""
         self._cards = [Card(rank, suit) for rank in Rank for suit in Suit for _ in range(decks_quantity)]
         self.shuffle()
 
     def shuffle(self) -> None:
-        """Shuffles the collection of cards"""
-        shuffle(self._cards)
+        """Shuffles the collection of cards, using the deck's own random generator if it was given"""
+        if self._random:
+            self._random.shuffle(self._cards)
+        else:
+            shuffle(self._cards)
         
\ No newline at end of file
@@ -0,0 +1,355 @@
+from random import Random
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .game import Game
+from .player import Player, Dealer
+from .cards import Deck, Hand, Rank
+from . import config
+from .exceptions import CardNotFound, IllegalAction
+
+
+ACTIONS = Game.ACTIONS + ('Double Down', 'Split')
+HIT, STAND, DOUBLE_DOWN, SPLIT = range(len(ACTIONS))
+
+# observation columns: active hand score, usable ace, dealer visible card value, playing a splitted hand
+OBSERVATION_SIZE = 4
+
+DEFAULT_BET = 10
+
+
+def _check_bet(bet: int) -> None:
+    if not 0 < bet <= config.INITIAL_CHIPS_QUANTITY:
+        raise ValueError(f'Bet needs to be between 1 and {config.INITIAL_CHIPS_QUANTITY} chips')
+
+
+class BlackjackEnv(Game):
+    """Gym-style environment playing one round of the Game per episode.
+
+    Observations are arrays of OBSERVATION_SIZE integers, actions are indices in ACTIONS
+    and the reward is the net chips won or lost in the round. Insurance is always declined.
+    Rounds settled without asking the player (a Blackjack or Dealer's Blackjack under an Ace)
+    only allow 'Stand', which ends the episode.
+    """
+
+    def __init__(self, bet: int=DEFAULT_BET, seed: Optional[int]=None) -> None:
+        super().__init__()
+        _check_bet(bet)
+        self.bet = bet
+        self._random = Random(seed)
+        self._finished = True
+        self.init()
+
+    def init(self) -> None:
+        self.deck = Deck(self._random)
+        self.deck.refill()
+        self.player = Player(chips=config.INITIAL_CHIPS_QUANTITY)
+        self.dealer = Dealer()
+
+    def reset(self) -> np.ndarray:
+        """Deals a new round and returns the first observation"""
+        if len(self.deck) <= config.REMAKE_DECK_AFTER:
+            self.deck.refill()
+        if self.player.chips < self.bet:
+            self.player = Player(chips=config.INITIAL_CHIPS_QUANTITY)
+        self._round_chips = self.player.chips
+        self._hands: List[Hand] = [self.player.hand]
+        self._bets = [self.player.make_quiet_bet(self.bet)]
+        self._blackjacks: List[bool] = []
+        self._settled = False
+        self._finished = False
+        self._give_initial_cards_to_player_and_dealer()
+
+        if self.dealer.hand[1].rank is Rank.ACE and self._check_for_dealer_blackjack():
+            self._settled = True
+        else:
+            self._open_hand()
+        return self._observation()
+
+    def step(self, action: int) -> Tuple[np.ndarray, int, bool, Dict[str, Any]]:
+        """Plays the action and returns observation, reward, done flag and info"""
+        if self._finished:
+            raise IllegalAction('The round is over, call reset()')
+        if not isinstance(action, (int, np.integer)) or action not in range(len(ACTIONS)) \
+                or not self.action_mask()[action]:
+            raise IllegalAction(action)
+        if not self._settled:
+            self._play_action(ACTIONS[action])
+        self._finished = self._settled
+        reward = self.player.chips - self._round_chips if self._settled else 0
+        return self._observation(), reward, self._settled, {'action_mask': self.action_mask()}
+
+    def action_mask(self) -> np.ndarray:
+        """Returns boolean array of the actions allowed for the current hand"""
+        if self._settled:
+            return np.array([action == 'Stand' for action in ACTIONS])
+        hand = self._hands[len(self._blackjacks)]
+        bet = self._bets[len(self._blackjacks)]
+        possible_actions = self._get_possible_actions(hand, bet, can_split=len(self._hands) == 1)
+        return np.array([action in possible_actions for action in ACTIONS])
+
+    def _play_action(self, action: str) -> None:
+        current = len(self._blackjacks)
+        hand = self._hands[current]
+        match action:
+            case 'Hit':
+                self._hit(hand)
+                if hand.score >= 21:
+                    self._close_hand()
+            case 'Stand':
+                self._close_hand()
+            case 'Double Down':
+                self._hit(hand)
+                self._bets[current] += self.player.make_quiet_bet(self._bets[current])
+                self._close_hand()
+            case 'Split':
+                self._bets.insert(0, self.player.make_quiet_bet(self._bets[current]))
+                self._split_hands()
+                self._hands = [self.player.split_hand, self.player.hand]
+                self._open_hand()
+
+    def _open_hand(self) -> None:
+        while len(self._blackjacks) < len(self._hands):
+            current = len(self._blackjacks)
+            if self._hands[current].score != 21:
+                return
+            bet = self._bets[current]
+            self.player.add_chips(int(bet + bet*1.5))
+            self._blackjacks.append(True)
+        self._settle()
+
+    def _close_hand(self) -> None:
+        self._blackjacks.append(False)
+        self._open_hand()
+
+    def _settle(self) -> None:
+        self._settled = True
+        busted = [hand.score > 21 for hand in self._hands]
+        if all(busted) or all(self._blackjacks):
+            return
+        dealer_score = self._play_quiet_dealer_hand(self.dealer.hand)
+        for hand, bet, blackjack in zip(self._hands, self._bets, self._blackjacks):
+            if blackjack or hand.score > 21:
+                continue
+            if dealer_score is None or hand.score > dealer_score:
+                self.player.add_chips(bet * 2)
+            elif hand.score == dealer_score:
+                self.player.add_chips(bet)
+
+    def _play_quiet_dealer_hand(self, hand: Hand) -> Optional[int]:
+        hand[0].hidden = False
+        while hand.score < config.DEALER_STANDS_ON:
+            self._give_card_from_deck(hand)
+        return hand.score if hand.score < 22 else None
+
+    def _observation(self) -> np.ndarray:
+        hand = self._hands[min(len(self._blackjacks), len(self._hands) - 1)]
+        score = hand.score
+        usable_ace = any(card.rank is Rank.ACE and card.value == 11 for card in hand)
+        return np.array(
+            [score, usable_ace, self.dealer.hand[1].rank.value.value, len(self._hands) > 1],
+            dtype=np.int16
+        )
+
+
+_RANKS = tuple(Rank)
+_RANK_VALUES = np.array([rank.value.value for rank in _RANKS], dtype=np.int16)
+_ACE = _RANKS.index(Rank.ACE)
+_ACE_VALUE = Rank.ACE.value.value
+_DEALER = 2
+
+
+class VectorBlackjackEnv:
+    """Steps num_tables independent tables at once, keeping every table state in NumPy arrays.
+
+    Follows the rules and observation/action/reward layout of BlackjackEnv. Step takes an array
+    of action indices and returns arrays; tables that finished their round are dealt a new one
+    right away, so the returned observations of done tables belong to the next round.
+    """
+
+    def __init__(self, num_tables: int, bet: int=DEFAULT_BET,
+                 decks_quantity: int=config.DECKS_QUANTITY, seed: Optional[int]=None) -> None:
+        _check_bet(bet)
+        self.num_tables = num_tables
+        self.bet = bet
+        self._rng = np.random.default_rng(seed)
+        self._rows = np.arange(num_tables)
+        self._shoe = np.repeat(np.arange(len(_RANKS), dtype=np.int8), 4 * decks_quantity)
+        self._shoes = np.tile(self._shoe, (num_tables, 1))
+        self._positions = np.full(num_tables, len(self._shoe))
+        self._chips = np.full(num_tables, config.INITIAL_CHIPS_QUANTITY, dtype=np.int64)
+        self._round_chips = np.zeros(num_tables, dtype=np.int64)
+        # hands 0 and 1 are player's hand and splitted hand, hand 2 is dealer's
+        self._totals = np.zeros((num_tables, 3), dtype=np.int16)
+        self._soft_aces = np.zeros((num_tables, 3), dtype=np.int16)
+        self._bets = np.zeros((num_tables, 2), dtype=np.int64)
+        self._blackjacks = np.zeros((num_tables, 2), dtype=bool)
+        self._upcards = np.zeros(num_tables, dtype=np.int8)
+        self._pair_ranks = np.full(num_tables, -1, dtype=np.int8)
+        self._split = np.zeros(num_tables, dtype=bool)
+        self._current = np.zeros(num_tables, dtype=np.int8)
+        self._settled = np.zeros(num_tables, dtype=bool)
+
+    def reset(self) -> np.ndarray:
+        """Deals a new round on every table and returns the observations"""
+        self._deal(self._rows)
+        return self._observation()
+
+    def step(self, actions: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, Dict[str, np.ndarray]]:
+        """Plays one action per table and returns observations, rewards, done flags and info"""
+        actions = np.asarray(actions)
+        if not np.issubdtype(actions.dtype, np.integer) or actions.shape != (self.num_tables,) \
+                or ((actions < 0) | (actions >= len(ACTIONS))).any():
+            raise IllegalAction(actions)
+        masks = self.action_masks()
+        if not masks[self._rows, actions].all():
+            raise IllegalAction(np.flatnonzero(~masks[self._rows, actions]))
+
+        live = ~self._settled
+        self._hit(np.flatnonzero(live & (actions == HIT)))
+        self._close_hands(np.flatnonzero(live & (actions == STAND)))
+        self._double_down(np.flatnonzero(live & (actions == DOUBLE_DOWN)))
+        self._split_hands(np.flatnonzero(live & (actions == SPLIT)))
+
+        dones = self._settled.copy()
+        rewards = np.where(dones, self._chips - self._round_chips, 0)
+        self._deal(np.flatnonzero(dones))
+        return self._observation(), rewards, dones, {'action_masks': self.action_masks()}
+
+    def action_masks(self) -> np.ndarray:
+        """Returns (num_tables, len(ACTIONS)) boolean array of the allowed actions"""
+        live = ~self._settled
+        enough_chips = self._chips - self._bets[self._rows, self._current] >= 0
+        masks = np.empty((self.num_tables, len(ACTIONS)), dtype=bool)
+        masks[:, HIT] = live
+        masks[:, STAND] = True
+        masks[:, DOUBLE_DOWN] = live & enough_chips
+        masks[:, SPLIT] = live & enough_chips & (self._pair_ranks >= 0) & ~self._split
+        return masks
+
+    def _deal(self, rows: np.ndarray) -> None:
+        reshuffle = rows[len(self._shoe) - self._positions[rows] <= len(self._shoe) / 3]
+        if len(reshuffle):
+            self._shoes[reshuffle] = self._rng.permuted(self._shoes[reshuffle], axis=1)
+            self._positions[reshuffle] = 0
+
+        broke = rows[self._chips[rows] < self.bet]
+        self._chips[broke] = config.INITIAL_CHIPS_QUANTITY
+        self._round_chips[rows] = self._chips[rows]
+        self._chips[rows] -= self.bet
+        self._bets[rows] = (self.bet, 0)
+        self._totals[rows] = 0
+        self._soft_aces[rows] = 0
+        self._blackjacks[rows] = False
+        self._split[rows] = False
+        self._current[rows] = 0
+        self._settled[rows] = False
+
+        player, dealer = np.zeros(len(rows), dtype=np.int8), np.full(len(rows), _DEALER, dtype=np.int8)
+        self._add_cards(rows, dealer, self._draw(rows))
+        first = self._draw(rows)
+        self._add_cards(rows, player, first)
+        self._upcards[rows] = self._draw(rows)
+        self._add_cards(rows, dealer, self._upcards[rows])
+        second = self._draw(rows)
+        self._add_cards(rows, player, second)
+        self._pair_ranks[rows] = np.where(first == second, first, -1)
+
+        peek = (self._upcards[rows] == _ACE) & (self._totals[rows, _DEALER] == 21)
+        self._settled[rows[peek]] = True
+        self._open_hands(rows[~peek])
+
+    def _draw(self, rows: np.ndarray) -> np.ndarray:
+        positions = self._positions[rows]
+        if (positions >= len(self._shoe)).any():
+            raise CardNotFound
+        self._positions[rows] += 1
+        return self._shoes[rows, positions]
+
+    def _add_cards(self, rows: np.ndarray, hands: np.ndarray, ranks: np.ndarray) -> None:
+        values = _RANK_VALUES[ranks]
+        totals = self._totals[rows, hands] + values
+        soft_aces = self._soft_aces[rows, hands] + (values == _ACE_VALUE)
+        over = (totals > 21) & (soft_aces > 0)
+        while over.any():
+            totals -= 10 * over
+            soft_aces -= over
+            over = (totals > 21) & (soft_aces > 0)
+        self._totals[rows, hands] = totals
+        self._soft_aces[rows, hands] = soft_aces
+
+    def _hit(self, rows: np.ndarray) -> None:
+        self._add_cards(rows, self._current[rows], self._draw(rows))
+        self._pair_ranks[rows] = -1
+        self._close_hands(rows[self._totals[rows, self._current[rows]] >= 21])
+
+    def _double_down(self, rows: np.ndarray) -> None:
+        hands = self._current[rows]
+        self._add_cards(rows, hands, self._draw(rows))
+        self._chips[rows] -= self._bets[rows, hands]
+        self._bets[rows, hands] *= 2
+        self._close_hands(rows)
+
+    def _split_hands(self, rows: np.ndarray) -> None:
+        self._chips[rows] -= self._bets[rows, 0]
+        self._bets[rows, 1] = self._bets[rows, 0]
+        self._split[rows] = True
+        self._current[rows] = 1
+        self._totals[rows, :2] = 0
+        self._soft_aces[rows, :2] = 0
+        pair_ranks = self._pair_ranks[rows]
+        self._pair_ranks[rows] = -1
+        for hand in (0, 1):
+            self._add_cards(rows, np.full(len(rows), hand), pair_ranks)
+        for hand in (0, 1):
+            self._add_cards(rows, np.full(len(rows), hand), self._draw(rows))
+        self._open_hands(rows)
+
+    def _open_hands(self, rows: np.ndarray) -> None:
+        """Pays Blackjack on the current two-card hands and moves on past them"""
+        if not len(rows):
+            return
+        blackjack = self._totals[rows, self._current[rows]] == 21
+        rows = rows[blackjack]
+        hands = self._current[rows]
+        self._blackjacks[rows, hands] = True
+        bets = self._bets[rows, hands]
+        self._chips[rows] += (bets + bets * 1.5).astype(np.int64)
+        self._close_hands(rows)
+
+    def _close_hands(self, rows: np.ndarray) -> None:
+        last_hand = self._current[rows] == 0
+        self._settle(rows[last_hand])
+        next_hand = rows[~last_hand]
+        self._current[next_hand] = 0
+        self._open_hands(next_hand)
+
+    def _settle(self, rows: np.ndarray) -> None:
+        rows = rows[~self._settled[rows]]
+        self._settled[rows] = True
+        played = np.ones((len(rows), 2), dtype=bool)
+        played[:, 1] = self._split[rows]
+        busted = self._totals[rows, :2] > 21
+        contenders = played & ~busted & ~self._blackjacks[rows]
+        dealer_plays = ~(busted | ~played).all(axis=1) & ~(self._blackjacks[rows] | ~played).all(axis=1)
+
+        rows, contenders = rows[dealer_plays], contenders[dealer_plays]
+        drawing = rows
+        while len(drawing):
+            drawing = drawing[self._totals[drawing, _DEALER] < config.DEALER_STANDS_ON]
+            self._add_cards(drawing, np.full(len(drawing), _DEALER), self._draw(drawing))
+
+        scores = self._totals[rows, :2]
+        dealer_scores = self._totals[rows, _DEALER][:, None]
+        won = contenders & ((dealer_scores > 21) | (scores > dealer_scores))
+        draw = contenders & (dealer_scores <= 21) & (scores == dealer_scores)
+        self._chips[rows] += (self._bets[rows] * (2 * won + draw)).sum(axis=1)
+
+    def _observation(self) -> np.ndarray:
+        observation = np.empty((self.num_tables, OBSERVATION_SIZE), dtype=np.int16)
+        observation[:, 0] = self._totals[self._rows, self._current]
+        observation[:, 1] = self._soft_aces[self._rows, self._current] > 0
+        observation[:, 2] = _RANK_VALUES[self._upcards]
+        observation[:, 3] = self._split
+        return observation
@@ -5,4 +5,7 @@ class StopGame(Exception):
     """Player exiting the game"""
 
 class HandSplitting(Exception):
-    """Player splits the hand"""
\ No newline at end of file
+    """Player splits the hand"""
+
+class IllegalAction(Exception):
+    """Action is not allowed by the table rules"""
\ No newline at end of file
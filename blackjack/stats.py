@@ -0,0 +1,148 @@
+from collections import Counter
+from math import sqrt
+from statistics import NormalDist
+from typing import Callable, Dict, Optional, Tuple
+
+import numpy as np
+
+from .env import VectorBlackjackEnv, DEFAULT_BET, HIT, STAND
+from . import config
+
+
+Policy = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+
+def _check_confidence(confidence: float) -> None:
+    if not 0 < confidence < 1:
+        raise ValueError('Confidence needs to be between 0 and 1')
+
+
+class RoundStatistics:
+    """A class accumulating statistics of net chips per round in constant memory.
+
+    Net chips of a round can only take a few dozen values for a given bet, so counting
+    rounds per value is an exact sketch of the distribution giving outcome frequencies
+    and percentiles, while mean and variance are updated in a streaming fashion.
+    """
+
+    def __init__(self, bet: int=DEFAULT_BET) -> None:
+        self.bet = bet
+        self._rounds = 0
+        self._mean = 0.0
+        self._squared_deviations = 0.0
+        self._net_chips_counts: Counter = Counter()
+
+    def update(self, net_chips: np.ndarray) -> None:
+        """Adds a batch of finished rounds, merging its moments with the accumulated ones"""
+        net_chips = np.asarray(net_chips)
+        if net_chips.ndim != 1:
+            raise ValueError('Net chips need to be a one-dimensional array')
+        if not np.issubdtype(net_chips.dtype, np.integer):
+            raise ValueError('Net chips need to be integer numbers')
+        if not len(net_chips):
+            return
+        values, counts = np.unique(net_chips, return_counts=True)
+        self._net_chips_counts.update(dict(zip(values.tolist(), counts.tolist())))
+        net_chips = net_chips.astype(np.float64)
+
+        batch_rounds = len(net_chips)
+        batch_mean = float(net_chips.mean())
+        rounds = self._rounds + batch_rounds
+        delta = batch_mean - self._mean
+        self._mean += delta * batch_rounds / rounds
+        self._squared_deviations += float(((net_chips - batch_mean) ** 2).sum()) + delta ** 2 * self._rounds * batch_rounds / rounds
+        self._rounds = rounds
+
+    @property
+    def rounds(self) -> int:
+        return self._rounds
+
+    @property
+    def mean(self) -> float:
+        """Returns mean net chips per round"""
+        return self._mean
+
+    @property
+    def variance(self) -> float:
+        """Returns sample variance of net chips per round"""
+        if self._rounds < 2:
+            return 0.0
+        return self._squared_deviations / (self._rounds - 1)
+
+    @property
+    def house_edge(self) -> float:
+        """Returns expected loss per round as a fraction of the initial bet"""
+        return -self._mean / self.bet
+
+    def confidence_interval(self, confidence: float=0.95) -> Tuple[float, float]:
+        """Returns the normal approximation confidence interval of the house edge"""
+        half_width = self._interval_half_width(confidence)
+        return self.house_edge - half_width, self.house_edge + half_width
+
+    def interval_width(self, confidence: float=0.95) -> float:
+        """Returns the width of the house edge confidence interval"""
+        return 2 * self._interval_half_width(confidence)
+
+    def outcome_frequencies(self) -> Dict[str, float]:
+        """Returns the shares of rounds won, lost and drawn by the player"""
+        self._check_rounds()
+        counts = Counter()
+        for net_chips, rounds in self._net_chips_counts.items():
+            counts['won' if net_chips > 0 else 'lost' if net_chips < 0 else 'draw'] += rounds
+        return {outcome: counts[outcome] / self._rounds for outcome in ('won', 'lost', 'draw')}
+
+    def net_chips_frequencies(self) -> Dict[int, float]:
+        """Returns the share of rounds for every observed net chips value"""
+        self._check_rounds()
+        return {net_chips: rounds / self._rounds for net_chips, rounds in sorted(self._net_chips_counts.items())}
+
+    def percentile(self, percent: float) -> int:
+        """Returns the net chips value below or at which the given percent of rounds fall"""
+        if not 0 <= percent <= 100:
+            raise ValueError('Percent needs to be between 0 and 100')
+        self._check_rounds()
+        threshold = percent / 100 * self._rounds
+        accumulated = 0
+        for net_chips, rounds in sorted(self._net_chips_counts.items()):
+            accumulated += rounds
+            if accumulated >= threshold:
+                return net_chips
+        return net_chips
+
+    def _check_rounds(self) -> None:
+        if not self._rounds:
+            raise ValueError('No rounds were accumulated')
+
+    def _interval_half_width(self, confidence: float) -> float:
+        _check_confidence(confidence)
+        if self._rounds < 2:
+            return float('inf')
+        z = NormalDist().inv_cdf((1 + confidence) / 2)
+        return z * sqrt(self.variance / self._rounds) / self.bet
+
+
+def dealer_policy(observations: np.ndarray, action_masks: np.ndarray) -> np.ndarray:
+    """Hits below the score Dealer stands on, like Dealer does"""
+    return np.where((observations[:, 0] < config.DEALER_STANDS_ON) & action_masks[:, HIT], HIT, STAND)
+
+
+def simulate(policy: Policy=dealer_policy, target_width: float=0.005, confidence: float=0.95,
+             num_tables: int=1024, bet: int=DEFAULT_BET, min_rounds: int=10_000,
+             max_rounds: int=100_000_000, seed: Optional[int]=None) -> RoundStatistics:
+    """Plays rounds with the policy until the house edge confidence interval is narrower than target_width"""
+    _check_confidence(confidence)
+    if target_width <= 0:
+        raise ValueError('Target width needs to be positive')
+    if min_rounds > max_rounds:
+        raise ValueError('Minimum rounds cannot exceed maximum rounds')
+    env = VectorBlackjackEnv(num_tables, bet=bet, seed=seed)
+    statistics = RoundStatistics(bet)
+    observations = env.reset()
+    action_masks = env.action_masks()
+    while statistics.rounds < max_rounds:
+        observations, rewards, dones, info = env.step(policy(observations, action_masks))
+        action_masks = info['action_masks']
+        statistics.update(rewards[dones])
+        if statistics.rounds >= min_rounds and statistics.interval_width(confidence) <= target_width:
+            break
+    return statistics
@@ -0,0 +1,194 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from blackjack.cards import Card, Rank, Suit
+from blackjack.env import BlackjackEnv, VectorBlackjackEnv, ACTIONS, HIT, STAND, DOUBLE_DOWN, SPLIT
+from blackjack.exceptions import IllegalAction
+
+
+class SingleTable:
+    """BlackjackEnv dealing the given ranks first"""
+
+    def __init__(self, ranks):
+        self.env = BlackjackEnv()
+        self.env.deck._cards = [Card(rank, Suit.SPADES) for rank in ranks] + [Card(Rank.TWO, Suit.CLUBS) for _ in range(200)]
+
+    def reset(self):
+        return self.env.reset(), self.env.action_mask()
+
+    def step(self, action):
+        observation, reward, done, info = self.env.step(action)
+        return observation, reward, done, info['action_mask']
+
+
+class VectorTable:
+    """VectorBlackjackEnv with one table dealing the given ranks first"""
+
+    def __init__(self, ranks):
+        self.env = VectorBlackjackEnv(1, seed=0)
+        self.env._positions[:] = 0
+        self.env._shoes[0, :len(ranks)] = [tuple(Rank).index(rank) for rank in ranks]
+
+    def reset(self):
+        return self.env.reset()[0], self.env.action_masks()[0]
+
+    def step(self, action):
+        observations, rewards, dones, info = self.env.step(np.array([action]))
+        return observations[0], rewards[0], dones[0], info['action_masks'][0]
+
+
+TABLES = pytest.mark.parametrize('table', [SingleTable, VectorTable])
+
+
+def only(*actions):
+    return [action in actions for action in range(len(ACTIONS))]
+
+
+# the deal order is Dealer's hidden card, player's card, Dealer's visible card, player's card
+
+@TABLES
+def test_player_blackjack_pays_three_to_two(table):
+    table = table([Rank.NINE, Rank.ACE, Rank.SEVEN, Rank.KING])
+    observation, mask = table.reset()
+    assert observation[0] == 21
+    assert mask.tolist() == only(STAND)
+    _, reward, done, _ = table.step(STAND)
+    assert (reward, done) == (15, True)
+
+
+@TABLES
+def test_dealer_blackjack_under_ace_settles_at_bet(table):
+    table = table([Rank.KING, Rank.NINE, Rank.ACE, Rank.NINE])
+    observation, mask = table.reset()
+    assert observation[2] == 11
+    assert mask.tolist() == only(STAND)
+    _, reward, done, _ = table.step(STAND)
+    assert (reward, done) == (-10, True)
+
+
+@TABLES
+def test_splitted_hand_is_played_first_and_cannot_be_splitted_again(table):
+    table = table([Rank.TEN, Rank.EIGHT, Rank.SEVEN, Rank.EIGHT, Rank.EIGHT, Rank.TEN, Rank.FOUR])
+    observation, mask = table.reset()
+    assert mask.tolist() == only(HIT, STAND, DOUBLE_DOWN, SPLIT)
+
+    observation, reward, done, mask = table.step(SPLIT)
+    assert observation.tolist() == [18, 0, 7, 1]
+    assert not mask[SPLIT]
+    observation, reward, done, mask = table.step(STAND)
+    assert observation.tolist() == [16, 0, 7, 1]
+    assert not mask[SPLIT]
+    observation, reward, done, mask = table.step(HIT)
+    assert observation[0] == 20
+    _, reward, done, _ = table.step(STAND)
+    assert (reward, done) == (20, True)
+
+
+@TABLES
+def test_double_down_doubles_the_bet(table):
+    table = table([Rank.TEN, Rank.SIX, Rank.SEVEN, Rank.FIVE, Rank.TEN])
+    table.reset()
+    _, reward, done, _ = table.step(DOUBLE_DOWN)
+    assert (reward, done) == (20, True)
+
+
+@TABLES
+def test_soft_aces_and_dealer_standing_on_soft_17(table):
+    table = table([Rank.ACE, Rank.ACE, Rank.SIX, Rank.FIVE, Rank.TEN, Rank.THREE])
+    observation, _ = table.reset()
+    assert observation[:2].tolist() == [16, 1]
+    observation, reward, done, _ = table.step(HIT)
+    assert observation[:2].tolist() == [16, 0]
+    observation, reward, done, _ = table.step(HIT)
+    assert observation[:2].tolist() == [19, 0]
+    _, reward, done, _ = table.step(STAND)
+    assert (reward, done) == (10, True)
+
+
+@TABLES
+@pytest.mark.parametrize('action', [HIT, DOUBLE_DOWN, SPLIT, -1, len(ACTIONS)])
+def test_masked_actions_are_illegal(table, action):
+    table = table([Rank.NINE, Rank.ACE, Rank.SEVEN, Rank.KING])
+    table.reset()
+    with pytest.raises(IllegalAction):
+        table.step(action)
+
+
+def test_step_after_finished_round_is_illegal():
+    table = SingleTable([Rank.NINE, Rank.ACE, Rank.SEVEN, Rank.KING])
+    table.reset()
+    table.step(STAND)
+    with pytest.raises(IllegalAction):
+        table.step(STAND)
+
+
+def test_vector_env_rejects_non_integer_actions():
+    env = VectorBlackjackEnv(2, seed=0)
+    env.reset()
+    with pytest.raises(IllegalAction):
+        env.step(np.array([1.0, 1.0]))
+
+
+def test_single_deck_shoe_is_not_reshuffled_every_round():
+    env = VectorBlackjackEnv(1, decks_quantity=1, seed=0)
+    env.reset()
+    env.step(np.array([STAND]))
+    assert env._positions[0] > 4
+
+
+def play_standing(env, rounds):
+    results = []
+    for _ in range(rounds):
+        observation, done = env.reset(), False
+        while not done:
+            _, reward, done, _ = env.step(STAND)
+        results.append((observation.tolist(), reward))
+    return results
+
+
+def test_seeded_single_env_is_reproducible():
+    assert play_standing(BlackjackEnv(seed=0), 200) == play_standing(BlackjackEnv(seed=0), 200)
+    assert play_standing(BlackjackEnv(seed=0), 200) != play_standing(BlackjackEnv(seed=1), 200)
+
+
+@pytest.mark.parametrize('env', [BlackjackEnv, lambda bet: VectorBlackjackEnv(1, bet=bet)])
+@pytest.mark.parametrize('bet', [0, -10, 1001])
+def test_bet_outside_of_chips_range_is_rejected(env, bet):
+    with pytest.raises(ValueError):
+        env(bet=bet)
+
+
+def random_policy(rng):
+    def policy(observations, masks):
+        actions = np.where(observations[:, 0] < 17, HIT, STAND)
+        draws = rng.random(len(observations))
+        actions = np.where((draws < 0.3) & masks[:, SPLIT], SPLIT, actions)
+        actions = np.where((draws > 0.8) & masks[:, DOUBLE_DOWN], DOUBLE_DOWN, actions)
+        return np.where(masks[np.arange(len(actions)), actions], actions, STAND)
+    return policy
+
+
+def test_vector_env_agrees_with_single_env():
+    policy = random_policy(np.random.default_rng(0))
+    env = BlackjackEnv(seed=0)
+    single = Counter()
+    for _ in range(20_000):
+        observation, mask, done = env.reset(), env.action_mask(), False
+        while not done:
+            observation, reward, done, info = env.step(policy(observation[None], mask[None])[0])
+            mask = info['action_mask']
+        single[reward] += 1
+
+    vector_env = VectorBlackjackEnv(1024, seed=0)
+    observations, masks = vector_env.reset(), vector_env.action_masks()
+    vector = Counter()
+    for _ in range(100):
+        observations, rewards, dones, info = vector_env.step(policy(observations, masks))
+        masks = info['action_masks']
+        vector.update(rewards[dones].tolist())
+
+    single_rounds, vector_rounds = sum(single.values()), sum(vector.values())
+    for net_chips in single.keys() | vector.keys():
+        assert single[net_chips] / single_rounds == pytest.approx(vector[net_chips] / vector_rounds, abs=0.015)
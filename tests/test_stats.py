@@ -0,0 +1,94 @@
+import numpy as np
+import pytest
+
+from blackjack import stats
+from blackjack.stats import RoundStatistics, simulate
+
+
+@pytest.fixture
+def net_chips():
+    return np.random.default_rng(0).integers(-40, 41, 100_001)
+
+
+def test_batched_moments_match_numpy(net_chips):
+    statistics = RoundStatistics()
+    for batch in np.array_split(net_chips, 37):
+        statistics.update(batch)
+    assert statistics.rounds == len(net_chips)
+    assert statistics.mean == pytest.approx(net_chips.mean(), abs=1e-12)
+    assert statistics.variance == pytest.approx(net_chips.var(ddof=1), abs=1e-10)
+    assert statistics.house_edge == pytest.approx(-net_chips.mean() / statistics.bet)
+
+
+@pytest.mark.parametrize('percent', [1, 25, 50, 75, 99])
+def test_percentile_matches_inverted_cdf(net_chips, percent):
+    statistics = RoundStatistics()
+    statistics.update(net_chips)
+    assert statistics.percentile(percent) == np.percentile(net_chips, percent, method='inverted_cdf')
+
+
+def test_outcome_frequencies():
+    statistics = RoundStatistics()
+    statistics.update(np.array([-10, -10, 0, 15]))
+    assert statistics.outcome_frequencies() == {'won': 0.25, 'lost': 0.5, 'draw': 0.25}
+    assert statistics.net_chips_frequencies() == {-10: 0.5, 0: 0.25, 15: 0.25}
+
+
+def test_empty_statistics_raise():
+    statistics = RoundStatistics()
+    statistics.update(np.array([], dtype=np.int64))
+    for method in (statistics.outcome_frequencies, statistics.net_chips_frequencies, lambda: statistics.percentile(50)):
+        with pytest.raises(ValueError):
+            method()
+
+
+@pytest.mark.parametrize('net_chips', [np.array([1.5, -10.0]), np.array([], dtype=np.float64)])
+def test_non_integer_net_chips_are_rejected(net_chips):
+    with pytest.raises(ValueError):
+        RoundStatistics().update(net_chips)
+
+
+def test_multidimensional_net_chips_are_rejected():
+    statistics = RoundStatistics()
+    with pytest.raises(ValueError):
+        statistics.update(np.array([[1, 2], [3, 4]]))
+    assert statistics.rounds == 0
+
+
+def test_simulation_stops_at_target_width():
+    statistics = simulate(target_width=0.02, min_rounds=50_000, seed=0)
+    assert statistics.rounds >= 50_000
+    assert statistics.interval_width() <= 0.02
+    low, high = statistics.confidence_interval()
+    assert low < statistics.house_edge < high
+
+
+@pytest.mark.parametrize('percent', [-1, 100.5])
+def test_percent_outside_of_range_is_rejected(percent):
+    statistics = RoundStatistics()
+    statistics.update(np.array([-10, 10]))
+    with pytest.raises(ValueError):
+        statistics.percentile(percent)
+
+
+@pytest.mark.parametrize('confidence', [0, 1, 1.5])
+def test_confidence_outside_of_range_is_rejected(confidence):
+    statistics = RoundStatistics()
+    statistics.update(np.array([-10, 10, 0]))
+    with pytest.raises(ValueError):
+        statistics.confidence_interval(confidence)
+    with pytest.raises(ValueError):
+        statistics.interval_width(confidence)
+
+
+@pytest.mark.parametrize('arguments', [
+    {'confidence': 1},
+    {'target_width': 0},
+    {'min_rounds': 100, 'max_rounds': 10},
+])
+def test_simulation_arguments_are_checked_before_playing(monkeypatch, arguments):
+    def fail(*args, **kwargs):
+        raise AssertionError('Environment was built')
+    monkeypatch.setattr(stats, 'VectorBlackjackEnv', fail)
+    with pytest.raises(ValueError):
+        simulate(**arguments)